@@ -3,8 +3,14 @@ Sistema de Gestión de Inventario
 Programa para administrar productos en una base de datos SQLite
 """
 
+import re
 import sqlite3
-from typing import Optional, List, Tuple
+import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
 
 # Intentar importar colorama para mejorar la interfaz (opcional)
 try:
@@ -20,6 +26,110 @@ except ImportError:
         BRIGHT = RESET_ALL = ""
 
 
+# Prefijos de color precalculados para no consultar Fore/Style en cada mensaje
+G, Y, C, R, M, B = Fore.GREEN, Fore.YELLOW, Fore.CYAN, Fore.RED, Fore.MAGENTA, Fore.BLUE
+SB = Style.BRIGHT
+SEP60 = C + SB + "=" * 60
+LINEA60 = C + "─" * 60
+
+# Valores que debe traer cada fila a registrar
+# (nombre, descripcion, cantidad, precio, categoria)
+COLUMNAS_POR_FILA = 5
+
+# Cantidad máxima de filas por INSERT múltiple (5 parámetros por fila,
+# por debajo del límite de 999 parámetros de SQLite)
+FILAS_POR_INSERT = 900 // COLUMNAS_POR_FILA
+
+# Cantidad de productos que se formatean juntos antes de escribir en pantalla
+PRODUCTOS_POR_ESCRITURA = 100
+
+# Consultas SQL reutilizadas por el gestor (SQLite reutiliza el plan compilado)
+SQL_INSERT = ("INSERT INTO productos (nombre, descripcion, cantidad, precio, categoria) "
+              "VALUES (?, ?, ?, ?, ?)")
+SQL_SELECT_ALL = "SELECT * FROM productos"
+SQL_SELECT_SUMMARY = "SELECT id, nombre, cantidad FROM productos"
+SQL_COUNT_ALL = "SELECT COUNT(*) FROM productos"
+SQL_BY_ID = "SELECT * FROM productos WHERE id = ?"
+SQL_EXISTS = "SELECT 1 FROM productos WHERE id = ? LIMIT 1"
+SQL_BY_NAME = "SELECT * FROM productos WHERE nombre LIKE ? ESCAPE '\\'"
+SQL_BY_NAME_GLOB = "SELECT * FROM productos WHERE nombre GLOB ?"
+SQL_CAT_NOT_NULL = "SELECT * FROM productos WHERE categoria IS NOT NULL"
+SQL_BY_CAT = "SELECT * FROM productos WHERE categoria LIKE ? ESCAPE '\\'"
+SQL_LOW_STOCK = "SELECT * FROM productos WHERE cantidad <= ?"
+SQL_DELETE = "DELETE FROM productos WHERE id = ?"
+
+# Formatos aceptados al ingresar números; se validan antes de convertir
+# para no depender de excepciones en el caso habitual. Los enteros se limitan
+# a 18 dígitos para que entren en un INTEGER de SQLite (64 bits) y la parte
+# entera de los decimales a 15 para que float() no devuelva 'inf'
+PATRON_ENTERO = re.compile(r"[-+]?\d{1,18}")
+PATRON_DECIMAL = re.compile(r"[-+]?(?:\d{1,15}(?:\.\d*)?|\.\d+)")
+
+# Reportes de bajo stock guardados en memoria: cantidad máxima de límites
+# distintos y segundos de validez (por si otro proceso modifica la base)
+MAX_REPORTES_CACHE = 16
+TTL_REPORTES_CACHE = 30.0
+
+# Patrones LIKE por modo de búsqueda; "prefijo" permite usar los índices
+PATRONES_BUSQUEDA = {"contiene": "%{}%", "prefijo": "{}%"}
+
+# Traducción de comodines LIKE a GLOB; los comodines propios de GLOB se
+# encierran entre corchetes para que se busquen de forma literal
+TRADUCCION_LIKE_GLOB = str.maketrans({"%": "*", "_": "?", "*": "[*]", "?": "[?]", "[": "[[]"})
+
+# Columnas modificables por actualizar_producto, en orden de bit de la máscara
+CAMPOS_ACTUALIZABLES = ("nombre", "descripcion", "cantidad", "precio", "categoria")
+
+
+@lru_cache(maxsize=None)
+def sql_insert_multiple(filas: int) -> str:
+    """
+    Retorna la consulta INSERT para registrar varias filas a la vez
+    
+    Args:
+        filas: Cantidad de filas que inserta la consulta
+    """
+    return SQL_INSERT + ", (?, ?, ?, ?, ?)" * (filas - 1)
+
+
+@lru_cache(maxsize=None)
+def sql_update(mascara: int) -> str:
+    """
+    Retorna la consulta UPDATE para los campos indicados en la máscara
+    
+    Args:
+        mascara: Bit i encendido si se actualiza CAMPOS_ACTUALIZABLES[i]
+    """
+    campos = [f"{campo} = ?" for i, campo in enumerate(CAMPOS_ACTUALIZABLES) if mascara & (1 << i)]
+    return f"UPDATE productos SET {', '.join(campos)} WHERE id = ? RETURNING *"
+
+
+def escapar_like(texto: str) -> str:
+    """
+    Escapa los comodines de LIKE para que el texto se busque de forma literal
+    
+    Args:
+        texto: Texto ingresado por el usuario
+        
+    Returns:
+        Texto con '\\', '%' y '_' escapados para usar con ESCAPE '\\'
+    """
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def patron_like_a_glob(patron: str) -> str:
+    """
+    Convierte un patrón con comodines de LIKE ('%', '_') a la sintaxis de GLOB
+    
+    Args:
+        patron: Patrón con comodines de LIKE
+        
+    Returns:
+        Patrón equivalente para GLOB, con sus caracteres especiales escapados
+    """
+    return patron.translate(TRADUCCION_LIKE_GLOB)
+
+
 class GestorInventario:
     """Clase principal para gestionar el inventario de productos"""
     
@@ -31,18 +141,62 @@ class GestorInventario:
             nombre_bd: Nombre del archivo de base de datos SQLite
         """
         self.nombre_bd = nombre_bd
+        self.conn = self.crear_conexion()
+        # Cursor compartido para las consultas que se leen por completo en el
+        # momento; los listados que se recorren de a poco usan su propio cursor
+        self._cur = self.conn.cursor()
+        # limite -> (momento de la consulta, filas); se vacía en cada escritura
+        self._cache_reportes: Dict[int, Tuple[float, List[sqlite3.Row]]] = {}
         self.crear_tabla()
     
+    def __enter__(self) -> "GestorInventario":
+        """Permite usar el gestor con la sentencia 'with'"""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Cierra la conexión al salir del bloque 'with'"""
+        self.cerrar()
+    
     def crear_conexion(self) -> sqlite3.Connection:
-        """Crea y retorna una conexión a la base de datos"""
-        return sqlite3.connect(self.nombre_bd)
+        """Crea y retorna la conexión a la base de datos que usa el gestor"""
+        # isolation_level=None: modo autocommit, las lecturas no abren transacciones
+        # implícitas; las escrituras de varias sentencias usan transaccion()
+        conn = sqlite3.connect(self.nombre_bd, check_same_thread=False, isolation_level=None,
+                               cached_statements=256)
+        # Filas accesibles por nombre de columna además de por posición
+        conn.row_factory = sqlite3.Row
+        
+        # Ajustes de rendimiento: se aplican una sola vez por conexión
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA mmap_size=268435456;
+        """)
+        return conn
+    
+    def cerrar(self) -> None:
+        """Cierra la conexión a la base de datos"""
+        self._cur.close()
+        self.conn.close()
+    
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        """Agrupa las sentencias del bloque 'with' en una única transacción"""
+        self._cur.execute("BEGIN")
+        try:
+            yield
+            self._cur.execute("COMMIT")
+        except BaseException:
+            # SQLite puede haber deshecho la transacción por su cuenta
+            if self.conn.in_transaction:
+                self._cur.execute("ROLLBACK")
+            raise
     
     def crear_tabla(self) -> None:
-        """Crea la tabla 'productos' si no existe"""
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        """Crea la tabla 'productos' y sus índices si no existen"""
+        self.conn.executescript("""
             CREATE TABLE IF NOT EXISTS productos (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 nombre TEXT NOT NULL,
@@ -50,11 +204,14 @@ class GestorInventario:
                 cantidad INTEGER NOT NULL,
                 precio REAL NOT NULL,
                 categoria TEXT
-            )
+            );
+            
+            -- Índices para las búsquedas por nombre/categoría y el reporte de stock
+            CREATE INDEX IF NOT EXISTS ix_prod_nombre ON productos(nombre COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS ix_prod_nombre_bin ON productos(nombre);
+            CREATE INDEX IF NOT EXISTS ix_prod_categoria ON productos(categoria COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS ix_prod_cantidad ON productos(cantidad);
         """)
-        
-        conn.commit()
-        conn.close()
     
     def registrar_producto(self, nombre: str, descripcion: str, cantidad: int, 
                           precio: float, categoria: str) -> bool:
@@ -71,39 +228,67 @@ class GestorInventario:
         Returns:
             True si el registro fue exitoso, False en caso contrario
         """
-        try:
-            conn = self.crear_conexion()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO productos (nombre, descripcion, cantidad, precio, categoria)
-                VALUES (?, ?, ?, ?, ?)
-            """, (nombre, descripcion, cantidad, precio, categoria))
+        return self.registrar_productos_bulk([(nombre, descripcion, cantidad, precio, categoria)])
+    
+    def registrar_productos_bulk(self, productos: Iterable[Tuple]) -> bool:
+        """
+        Registra varios productos en una única transacción
+        
+        Args:
+            productos: Tuplas (nombre, descripcion, cantidad, precio, categoria)
             
-            conn.commit()
-            conn.close()
+        Returns:
+            True si el registro fue exitoso, False en caso contrario
+        """
+        productos = iter(productos)
+        try:
+            # Todos los INSERT van en un solo BEGIN/COMMIT; cada INSERT lleva
+            # varias filas sin superar el límite de parámetros
+            with self.transaccion():
+                while True:
+                    lote = list(islice(productos, FILAS_POR_INSERT))
+                    if not lote:
+                        break
+                    # Al aplanar el lote, una fila con valores de más o de menos
+                    # correría los valores de las filas siguientes
+                    if any(len(fila) != COLUMNAS_POR_FILA for fila in lote):
+                        raise sqlite3.ProgrammingError(
+                            f"Cada producto debe tener {COLUMNAS_POR_FILA} valores")
+                    self._cur.execute(sql_insert_multiple(len(lote)), list(chain.from_iterable(lote)))
+            self._cache_reportes.clear()
             return True
         except sqlite3.Error as e:
-            print(f"{Fore.RED}Error al registrar producto: {e}")
+            print(f"{R}Error al registrar producto: {e}")
             return False
     
-    def visualizar_productos(self) -> List[Tuple]:
+    def visualizar_productos(self) -> Iterator[sqlite3.Row]:
         """
-        Obtiene todos los productos de la base de datos
+        Obtiene todos los productos de la base de datos a medida que se leen
         
         Returns:
-            Lista de tuplas con los datos de todos los productos
+            Iterador de filas con los datos de todos los productos
         """
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
+        yield from self.conn.execute(SQL_SELECT_ALL)
+    
+    def listar_resumen(self) -> Iterator[sqlite3.Row]:
+        """
+        Obtiene solo el ID, nombre y cantidad de todos los productos
         
-        cursor.execute("SELECT * FROM productos")
-        productos = cursor.fetchall()
+        Returns:
+            Iterador de filas (id, nombre, cantidad)
+        """
+        yield from self.conn.execute(SQL_SELECT_SUMMARY)
+    
+    def contar_productos(self) -> int:
+        """
+        Cuenta los productos registrados
         
-        conn.close()
-        return productos
+        Returns:
+            Cantidad total de productos
+        """
+        return self._cur.execute(SQL_COUNT_ALL).fetchone()[0]
     
-    def buscar_producto_por_id(self, id_producto: int) -> Optional[Tuple]:
+    def buscar_producto_por_id(self, id_producto: int) -> Optional[sqlite3.Row]:
         """
         Busca un producto específico por su ID
         
@@ -111,58 +296,82 @@ class GestorInventario:
             id_producto: ID del producto a buscar
             
         Returns:
-            Tupla con los datos del producto o None si no existe
+            Fila con los datos del producto o None si no existe
         """
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM productos WHERE id = ?", (id_producto,))
+        cursor = self._cur.execute(SQL_BY_ID, (id_producto,))
         producto = cursor.fetchone()
-        
-        conn.close()
         return producto
     
-    def buscar_productos_por_nombre(self, nombre: str) -> List[Tuple]:
+    def existe_producto(self, id_producto: int) -> bool:
         """
-        Busca productos por nombre (búsqueda parcial)
+        Verifica si existe un producto con el ID indicado sin leer sus datos
         
         Args:
-            nombre: Nombre o parte del nombre a buscar
+            id_producto: ID del producto a verificar
             
         Returns:
-            Lista de tuplas con los productos encontrados
+            True si el producto existe, False en caso contrario
+        """
+        return self._cur.execute(SQL_EXISTS, (id_producto,)).fetchone() is not None
+    
+    def buscar_productos_por_nombre(self, nombre: str, modo: str = "contiene") -> List[sqlite3.Row]:
         """
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
+        Busca productos por nombre (búsqueda parcial)
         
-        cursor.execute("SELECT * FROM productos WHERE nombre LIKE ?", (f"%{nombre}%",))
+        Args:
+            nombre: Nombre o parte del nombre a buscar
+            modo: "contiene" busca en cualquier parte del nombre; "prefijo"
+                  busca nombres que empiezan con el texto y usa el índice
+                  
+        Returns:
+            Lista de filas con los productos encontrados
+        """
+        # Un texto vacío coincide con todos los productos: no hace falta el LIKE
+        if not nombre:
+            return list(self.visualizar_productos())
+        cursor = self._cur.execute(SQL_BY_NAME, (PATRONES_BUSQUEDA[modo].format(escapar_like(nombre)),))
         productos = cursor.fetchall()
+        return productos
+    
+    def buscar_productos_por_nombre_glob(self, patron: str) -> List[sqlite3.Row]:
+        """
+        Busca productos por nombre distinguiendo mayúsculas y minúsculas
         
-        conn.close()
+        Args:
+            patron: Patrón de búsqueda; '%' equivale a cualquier texto y '_'
+                    a un carácter, como en LIKE
+                    
+        Returns:
+            Lista de filas con los productos encontrados
+        """
+        if not patron:
+            return list(self.visualizar_productos())
+        cursor = self._cur.execute(SQL_BY_NAME_GLOB, (patron_like_a_glob(patron),))
+        productos = cursor.fetchall()
         return productos
     
-    def buscar_productos_por_categoria(self, categoria: str) -> List[Tuple]:
+    def buscar_productos_por_categoria(self, categoria: str, modo: str = "contiene") -> List[sqlite3.Row]:
         """
         Busca productos por categoría
         
         Args:
             categoria: Categoría a buscar
-            
+            modo: "contiene" busca en cualquier parte de la categoría; "prefijo"
+                  busca categorías que empiezan con el texto y usa el índice
+                  
         Returns:
-            Lista de tuplas con los productos encontrados
+            Lista de filas con los productos encontrados
         """
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM productos WHERE categoria LIKE ?", (f"%{categoria}%",))
+        # Un texto vacío coincide con toda categoría no nula, igual que LIKE '%%'
+        if not categoria:
+            return self._cur.execute(SQL_CAT_NOT_NULL).fetchall()
+        cursor = self._cur.execute(SQL_BY_CAT, (PATRONES_BUSQUEDA[modo].format(escapar_like(categoria)),))
         productos = cursor.fetchall()
-        
-        conn.close()
         return productos
     
     def actualizar_producto(self, id_producto: int, nombre: str = None, 
                            descripcion: str = None, cantidad: int = None,
-                           precio: float = None, categoria: str = None) -> bool:
+                           precio: float = None, categoria: str = None) -> Optional[sqlite3.Row]:
         """
         Actualiza los datos de un producto existente
         
@@ -175,51 +384,31 @@ class GestorInventario:
             categoria: Nueva categoría (opcional)
             
         Returns:
-            True si la actualización fue exitosa, False en caso contrario
+            Fila con los datos actualizados del producto o None si no se actualizó
         """
-        # Verificar que el producto existe
-        if not self.buscar_producto_por_id(id_producto):
-            print(f"{Fore.RED}El producto con ID {id_producto} no existe.")
-            return False
-        
         try:
-            conn = self.crear_conexion()
-            cursor = conn.cursor()
-            
-            # Construir la consulta SQL dinámicamente según los campos a actualizar
-            campos_actualizar = []
-            valores = []
+            # Elegir la consulta SQL según los campos a actualizar (mismo
+            # orden que CAMPOS_ACTUALIZABLES)
+            campos = (nombre, descripcion, cantidad, precio, categoria)
+            mascara = sum(1 << i for i, valor in enumerate(campos) if valor is not None)
             
-            if nombre is not None:
-                campos_actualizar.append("nombre = ?")
-                valores.append(nombre)
-            if descripcion is not None:
-                campos_actualizar.append("descripcion = ?")
-                valores.append(descripcion)
-            if cantidad is not None:
-                campos_actualizar.append("cantidad = ?")
-                valores.append(cantidad)
-            if precio is not None:
-                campos_actualizar.append("precio = ?")
-                valores.append(precio)
-            if categoria is not None:
-                campos_actualizar.append("categoria = ?")
-                valores.append(categoria)
+            if not mascara:
+                print(f"{Y}No se especificaron campos para actualizar.")
+                return None
             
-            if not campos_actualizar:
-                print(f"{Fore.YELLOW}No se especificaron campos para actualizar.")
-                return False
+            valores = [valor for valor in campos if valor is not None] + [id_producto]
             
-            valores.append(id_producto)
-            consulta = f"UPDATE productos SET {', '.join(campos_actualizar)} WHERE id = ?"
-            
-            cursor.execute(consulta, valores)
-            conn.commit()
-            conn.close()
-            return True
+            # RETURNING devuelve la fila modificada sin una consulta adicional
+            filas = self._cur.execute(sql_update(mascara), valores).fetchall()
         except sqlite3.Error as e:
-            print(f"{Fore.RED}Error al actualizar producto: {e}")
-            return False
+            print(f"{R}Error al actualizar producto: {e}")
+            return None
+        
+        if not filas:
+            print(f"{R}El producto con ID {id_producto} no existe.")
+            return None
+        self._cache_reportes.clear()
+        return filas[0]
     
     def eliminar_producto(self, id_producto: int) -> bool:
         """
@@ -231,25 +420,19 @@ class GestorInventario:
         Returns:
             True si la eliminación fue exitosa, False en caso contrario
         """
-        # Verificar que el producto existe
-        if not self.buscar_producto_por_id(id_producto):
-            print(f"{Fore.RED}El producto con ID {id_producto} no existe.")
-            return False
-        
         try:
-            conn = self.crear_conexion()
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM productos WHERE id = ?", (id_producto,))
-            
-            conn.commit()
-            conn.close()
-            return True
+            cursor = self._cur.execute(SQL_DELETE, (id_producto,))
         except sqlite3.Error as e:
-            print(f"{Fore.RED}Error al eliminar producto: {e}")
+            print(f"{R}Error al eliminar producto: {e}")
             return False
+        
+        if cursor.rowcount == 0:
+            print(f"{R}El producto con ID {id_producto} no existe.")
+            return False
+        self._cache_reportes.clear()
+        return True
     
-    def reporte_bajo_stock(self, limite: int) -> List[Tuple]:
+    def reporte_bajo_stock(self, limite: int) -> Iterator[sqlite3.Row]:
         """
         Genera un reporte de productos con cantidad igual o inferior al límite
         
@@ -257,48 +440,108 @@ class GestorInventario:
             limite: Cantidad límite para el reporte
             
         Returns:
-            Lista de tuplas con los productos que cumplen la condición
+            Iterador de filas con los productos que cumplen la condición
         """
-        conn = self.crear_conexion()
-        cursor = conn.cursor()
+        return iter(self._filas_bajo_stock(limite))
+    
+    def contar_bajo_stock(self, limite: int) -> int:
+        """
+        Cuenta los productos con cantidad igual o inferior al límite
         
-        cursor.execute("SELECT * FROM productos WHERE cantidad <= ?", (limite,))
-        productos = cursor.fetchall()
+        Args:
+            limite: Cantidad límite para el reporte
+            
+        Returns:
+            Cantidad de productos que cumplen la condición
+        """
+        return len(self._filas_bajo_stock(limite))
+    
+    def _filas_bajo_stock(self, limite: int) -> List[sqlite3.Row]:
+        """
+        Obtiene las filas del reporte de bajo stock, reutilizando el resultado
+        guardado si la base no cambió desde la última consulta
         
-        conn.close()
-        return productos
+        Args:
+            limite: Cantidad límite para el reporte
+            
+        Returns:
+            Lista de filas con los productos que cumplen la condición
+        """
+        ahora = time.monotonic()
+        guardado = self._cache_reportes.get(limite)
+        if guardado is not None and ahora - guardado[0] < TTL_REPORTES_CACHE:
+            return guardado[1]
+        
+        filas = self._cur.execute(SQL_LOW_STOCK, (limite,)).fetchall()
+        self._cache_reportes.pop(limite, None)
+        if len(self._cache_reportes) >= MAX_REPORTES_CACHE:
+            # Descartar el límite consultado hace más tiempo
+            del self._cache_reportes[next(iter(self._cache_reportes))]
+        self._cache_reportes[limite] = (ahora, filas)
+        return filas
 
 
 def mostrar_menu_principal() -> None:
     """Muestra el menú principal de la aplicación"""
-    print(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*60}")
-    print(f"{Fore.CYAN}{Style.BRIGHT}{'SISTEMA DE GESTIÓN DE INVENTARIO':^60}")
-    print(f"{Fore.CYAN}{Style.BRIGHT}{'='*60}")
-    print(f"{Fore.GREEN}1. {Fore.YELLOW}Registrar nuevo producto")
-    print(f"{Fore.GREEN}2. {Fore.YELLOW}Visualizar todos los productos")
-    print(f"{Fore.GREEN}3. {Fore.YELLOW}Buscar producto")
-    print(f"{Fore.GREEN}4. {Fore.YELLOW}Actualizar producto")
-    print(f"{Fore.GREEN}5. {Fore.YELLOW}Eliminar producto")
-    print(f"{Fore.GREEN}6. {Fore.YELLOW}Reporte de bajo stock")
-    print(f"{Fore.GREEN}0. {Fore.RED}Salir")
-    print(f"{Fore.CYAN}{Style.BRIGHT}{'='*60}")
-
-
-def mostrar_producto(producto: Tuple) -> None:
+    print(f"\n{SEP60}")
+    print(f"{C}{SB}{'SISTEMA DE GESTIÓN DE INVENTARIO':^60}")
+    print(f"{SEP60}")
+    print(f"{G}1. {Y}Registrar nuevo producto")
+    print(f"{G}2. {Y}Visualizar todos los productos")
+    print(f"{G}3. {Y}Buscar producto")
+    print(f"{G}4. {Y}Actualizar producto")
+    print(f"{G}5. {Y}Eliminar producto")
+    print(f"{G}6. {Y}Reporte de bajo stock")
+    print(f"{G}0. {R}Salir")
+    print(f"{SEP60}")
+
+
+def formatear_producto(producto: sqlite3.Row) -> str:
+    """
+    Arma el texto con los detalles de un producto de forma formateada
+    
+    Args:
+        producto: Fila con los datos del producto
+        
+    Returns:
+        Texto de varias líneas listo para mostrar (con salto de línea final)
+    """
+    return (f"{LINEA60}\n"
+            f"{G}ID:          {Y}{producto['id']}\n"
+            f"{G}Nombre:      {Y}{producto['nombre']}\n"
+            f"{G}Descripción: {Y}{producto['descripcion']}\n"
+            f"{G}Cantidad:    {Y}{producto['cantidad']}\n"
+            f"{G}Precio:      {Y}${producto['precio']:.2f}\n"
+            f"{G}Categoría:   {Y}{producto['categoria']}\n"
+            f"{LINEA60}\n")
+
+
+def mostrar_producto(producto: sqlite3.Row) -> None:
     """
     Muestra los detalles de un producto de forma formateada
     
     Args:
-        producto: Tupla con los datos del producto
+        producto: Fila con los datos del producto
     """
-    print(f"{Fore.CYAN}{'─'*60}")
-    print(f"{Fore.GREEN}ID:          {Fore.YELLOW}{producto[0]}")
-    print(f"{Fore.GREEN}Nombre:      {Fore.YELLOW}{producto[1]}")
-    print(f"{Fore.GREEN}Descripción: {Fore.YELLOW}{producto[2]}")
-    print(f"{Fore.GREEN}Cantidad:    {Fore.YELLOW}{producto[3]}")
-    print(f"{Fore.GREEN}Precio:      {Fore.YELLOW}${producto[4]:.2f}")
-    print(f"{Fore.GREEN}Categoría:   {Fore.YELLOW}{producto[5]}")
-    print(f"{Fore.CYAN}{'─'*60}")
+    sys.stdout.write(formatear_producto(producto))
+    sys.stdout.flush()
+
+
+def mostrar_productos(productos: Iterable[sqlite3.Row]) -> None:
+    """
+    Muestra varios productos escribiendo la salida en bloques en lugar de
+    línea por línea
+    
+    Args:
+        productos: Filas con los datos de los productos
+    """
+    productos = iter(productos)
+    while True:
+        lote = list(islice(productos, PRODUCTOS_POR_ESCRITURA))
+        if not lote:
+            break
+        sys.stdout.write("".join(map(formatear_producto, lote)))
+    sys.stdout.flush()
 
 
 def obtener_entero(mensaje: str) -> Optional[int]:
@@ -311,11 +554,11 @@ def obtener_entero(mensaje: str) -> Optional[int]:
     Returns:
         Número entero ingresado o None si hubo error
     """
-    try:
-        return int(input(mensaje))
-    except ValueError:
-        print(f"{Fore.RED}Error: Debe ingresar un número entero válido.")
-        return None
+    texto = input(mensaje).strip()
+    if PATRON_ENTERO.fullmatch(texto):
+        return int(texto)
+    print(f"{R}Error: Debe ingresar un número entero válido.")
+    return None
 
 
 def obtener_decimal(mensaje: str) -> Optional[float]:
@@ -328,196 +571,233 @@ def obtener_decimal(mensaje: str) -> Optional[float]:
     Returns:
         Número decimal ingresado o None si hubo error
     """
-    try:
-        return float(input(mensaje))
-    except ValueError:
-        print(f"{Fore.RED}Error: Debe ingresar un número válido.")
-        return None
+    texto = input(mensaje).strip()
+    if PATRON_DECIMAL.fullmatch(texto):
+        return float(texto)
+    print(f"{R}Error: Debe ingresar un número válido.")
+    return None
 
 
 def opcion_registrar(gestor: GestorInventario) -> None:
     """Maneja la opción de registrar un nuevo producto"""
-    print(f"\n{Fore.MAGENTA}{Style.BRIGHT}REGISTRAR NUEVO PRODUCTO")
-    print(f"{Fore.CYAN}{'─'*60}")
+    print(f"\n{M}{SB}REGISTRAR NUEVO PRODUCTO")
+    print(f"{LINEA60}")
     
-    nombre = input(f"{Fore.GREEN}Nombre del producto: {Fore.YELLOW}")
-    descripcion = input(f"{Fore.GREEN}Descripción: {Fore.YELLOW}")
+    nombre = input(f"{G}Nombre del producto: {Y}")
+    descripcion = input(f"{G}Descripción: {Y}")
     
-    cantidad = obtener_entero(f"{Fore.GREEN}Cantidad: {Fore.YELLOW}")
+    cantidad = obtener_entero(f"{G}Cantidad: {Y}")
     if cantidad is None:
         return
     
-    precio = obtener_decimal(f"{Fore.GREEN}Precio: {Fore.YELLOW}$")
+    precio = obtener_decimal(f"{G}Precio: {Y}$")
     if precio is None:
         return
     
-    categoria = input(f"{Fore.GREEN}Categoría: {Fore.YELLOW}")
+    categoria = input(f"{G}Categoría: {Y}")
     
     if gestor.registrar_producto(nombre, descripcion, cantidad, precio, categoria):
-        print(f"{Fore.GREEN}{Style.BRIGHT}✓ Producto registrado exitosamente.")
+        print(f"{G}{SB}✓ Producto registrado exitosamente.")
     else:
-        print(f"{Fore.RED}{Style.BRIGHT}✗ Error al registrar el producto.")
+        print(f"{R}{SB}✗ Error al registrar el producto.")
 
 
 def opcion_visualizar(gestor: GestorInventario) -> None:
     """Maneja la opción de visualizar todos los productos"""
-    print(f"\n{Fore.MAGENTA}{Style.BRIGHT}LISTADO DE PRODUCTOS")
+    print(f"\n{M}{SB}LISTADO DE PRODUCTOS")
     
-    productos = gestor.visualizar_productos()
+    total = gestor.contar_productos()
     
-    if not productos:
-        print(f"{Fore.YELLOW}No hay productos registrados en el inventario.")
+    if not total:
+        print(f"{Y}No hay productos registrados en el inventario.")
         return
     
-    print(f"{Fore.CYAN}Se encontraron {len(productos)} producto(s):\n")
-    for producto in productos:
-        mostrar_producto(producto)
+    print(f"{C}Se encontraron {total} producto(s):\n")
+    mostrar_productos(gestor.visualizar_productos())
 
 
 def opcion_buscar(gestor: GestorInventario) -> None:
     """Maneja la opción de buscar productos"""
-    print(f"\n{Fore.MAGENTA}{Style.BRIGHT}BUSCAR PRODUCTO")
-    print(f"{Fore.CYAN}{'─'*60}")
-    print(f"{Fore.GREEN}1. {Fore.YELLOW}Buscar por ID")
-    print(f"{Fore.GREEN}2. {Fore.YELLOW}Buscar por nombre")
-    print(f"{Fore.GREEN}3. {Fore.YELLOW}Buscar por categoría")
-    print(f"{Fore.CYAN}{'─'*60}")
+    print(f"\n{M}{SB}BUSCAR PRODUCTO")
+    print(f"{LINEA60}")
+    print(f"{G}1. {Y}Buscar por ID")
+    print(f"{G}2. {Y}Buscar por nombre")
+    print(f"{G}3. {Y}Buscar por categoría")
+    print(f"{G}4. {Y}Buscar por patrón de nombre (distingue mayúsculas, comodines % y _)")
+    print(f"{LINEA60}")
     
-    opcion = input(f"{Fore.GREEN}Seleccione una opción: {Fore.YELLOW}")
+    opcion = input(f"{G}Seleccione una opción: {Y}")
     
     if opcion == "1":
-        id_producto = obtener_entero(f"{Fore.GREEN}Ingrese el ID del producto: {Fore.YELLOW}")
+        id_producto = obtener_entero(f"{G}Ingrese el ID del producto: {Y}")
         if id_producto is None:
             return
         
         producto = gestor.buscar_producto_por_id(id_producto)
         if producto:
-            print(f"\n{Fore.CYAN}Producto encontrado:")
+            print(f"\n{C}Producto encontrado:")
             mostrar_producto(producto)
         else:
-            print(f"{Fore.YELLOW}No se encontró ningún producto con ese ID.")
+            print(f"{Y}No se encontró ningún producto con ese ID.")
     
     elif opcion == "2":
-        nombre = input(f"{Fore.GREEN}Ingrese el nombre a buscar: {Fore.YELLOW}")
-        productos = gestor.buscar_productos_por_nombre(nombre)
+        nombre = input(f"{G}Ingrese el nombre a buscar: {Y}")
+        # Primero la búsqueda por prefijo (usa el índice); si no hay
+        # resultados, se busca el texto en cualquier parte del nombre
+        productos = (gestor.buscar_productos_por_nombre(nombre, "prefijo")
+                     or gestor.buscar_productos_por_nombre(nombre))
         
         if productos:
-            print(f"\n{Fore.CYAN}Se encontraron {len(productos)} producto(s):")
-            for producto in productos:
-                mostrar_producto(producto)
+            print(f"\n{C}Se encontraron {len(productos)} producto(s):")
+            mostrar_productos(productos)
         else:
-            print(f"{Fore.YELLOW}No se encontraron productos con ese nombre.")
+            print(f"{Y}No se encontraron productos con ese nombre.")
     
     elif opcion == "3":
-        categoria = input(f"{Fore.GREEN}Ingrese la categoría a buscar: {Fore.YELLOW}")
-        productos = gestor.buscar_productos_por_categoria(categoria)
+        categoria = input(f"{G}Ingrese la categoría a buscar: {Y}")
+        # Primero la búsqueda por prefijo (usa el índice); si no hay
+        # resultados, se busca el texto en cualquier parte de la categoría
+        productos = (gestor.buscar_productos_por_categoria(categoria, "prefijo")
+                     or gestor.buscar_productos_por_categoria(categoria))
+        
+        if productos:
+            print(f"\n{C}Se encontraron {len(productos)} producto(s):")
+            mostrar_productos(productos)
+        else:
+            print(f"{Y}No se encontraron productos en esa categoría.")
+    
+    elif opcion == "4":
+        # El patrón se usa tal cual: con un prefijo literal ("Ma%") aprovecha
+        # el índice ix_prod_nombre_bin
+        patron = input(f"{G}Ingrese el patrón a buscar (ej. Ma%): {Y}")
+        productos = gestor.buscar_productos_por_nombre_glob(patron)
         
         if productos:
-            print(f"\n{Fore.CYAN}Se encontraron {len(productos)} producto(s):")
-            for producto in productos:
-                mostrar_producto(producto)
+            print(f"\n{C}Se encontraron {len(productos)} producto(s):")
+            mostrar_productos(productos)
         else:
-            print(f"{Fore.YELLOW}No se encontraron productos en esa categoría.")
+            print(f"{Y}No se encontraron productos con ese patrón.")
     
     else:
-        print(f"{Fore.RED}Opción no válida.")
+        print(f"{R}Opción no válida.")
 
 
 def opcion_actualizar(gestor: GestorInventario) -> None:
     """Maneja la opción de actualizar un producto"""
-    print(f"\n{Fore.MAGENTA}{Style.BRIGHT}ACTUALIZAR PRODUCTO")
-    print(f"{Fore.CYAN}{'─'*60}")
+    print(f"\n{M}{SB}ACTUALIZAR PRODUCTO")
+    print(f"{LINEA60}")
     
-    id_producto = obtener_entero(f"{Fore.GREEN}Ingrese el ID del producto a actualizar: {Fore.YELLOW}")
+    id_producto = obtener_entero(f"{G}Ingrese el ID del producto a actualizar: {Y}")
     if id_producto is None:
         return
     
     producto = gestor.buscar_producto_por_id(id_producto)
     if not producto:
-        print(f"{Fore.RED}El producto con ID {id_producto} no existe.")
+        print(f"{R}El producto con ID {id_producto} no existe.")
         return
     
-    print(f"\n{Fore.CYAN}Producto actual:")
+    print(f"\n{C}Producto actual:")
     mostrar_producto(producto)
     
-    print(f"\n{Fore.YELLOW}Ingrese los nuevos valores (presione Enter para mantener el actual):")
+    print(f"\n{Y}Ingrese los nuevos valores (presione Enter para mantener el actual):")
     
-    nombre = input(f"{Fore.GREEN}Nuevo nombre [{producto[1]}]: {Fore.YELLOW}") or None
-    descripcion = input(f"{Fore.GREEN}Nueva descripción [{producto[2]}]: {Fore.YELLOW}") or None
+    nombre = input(f"{G}Nuevo nombre [{producto['nombre']}]: {Y}") or None
+    descripcion = input(f"{G}Nueva descripción [{producto['descripcion']}]: {Y}") or None
     
-    cantidad_input = input(f"{Fore.GREEN}Nueva cantidad [{producto[3]}]: {Fore.YELLOW}")
+    cantidad_input = input(f"{G}Nueva cantidad [{producto['cantidad']}]: {Y}").strip()
+    if cantidad_input and not PATRON_ENTERO.fullmatch(cantidad_input):
+        print(f"{R}Error: Debe ingresar un número entero válido.")
+        return
     cantidad = int(cantidad_input) if cantidad_input else None
     
-    precio_input = input(f"{Fore.GREEN}Nuevo precio [${producto[4]:.2f}]: {Fore.YELLOW}")
+    precio_input = input(f"{G}Nuevo precio [${producto['precio']:.2f}]: {Y}").strip()
+    if precio_input and not PATRON_DECIMAL.fullmatch(precio_input):
+        print(f"{R}Error: Debe ingresar un número válido.")
+        return
     precio = float(precio_input) if precio_input else None
     
-    categoria = input(f"{Fore.GREEN}Nueva categoría [{producto[5]}]: {Fore.YELLOW}") or None
+    categoria = input(f"{G}Nueva categoría [{producto['categoria']}]: {Y}") or None
     
-    if gestor.actualizar_producto(id_producto, nombre, descripcion, cantidad, precio, categoria):
-        print(f"{Fore.GREEN}{Style.BRIGHT}✓ Producto actualizado exitosamente.")
+    producto_actualizado = gestor.actualizar_producto(id_producto, nombre, descripcion, cantidad,
+                                                      precio, categoria)
+    if producto_actualizado:
+        print(f"{G}{SB}✓ Producto actualizado exitosamente.")
         
         # Mostrar el producto actualizado
-        producto_actualizado = gestor.buscar_producto_por_id(id_producto)
-        print(f"\n{Fore.CYAN}Producto actualizado:")
+        print(f"\n{C}Producto actualizado:")
         mostrar_producto(producto_actualizado)
     else:
-        print(f"{Fore.RED}{Style.BRIGHT}✗ Error al actualizar el producto.")
+        print(f"{R}{SB}✗ Error al actualizar el producto.")
 
 
 def opcion_eliminar(gestor: GestorInventario) -> None:
     """Maneja la opción de eliminar un producto"""
-    print(f"\n{Fore.MAGENTA}{Style.BRIGHT}ELIMINAR PRODUCTO")
-    print(f"{Fore.CYAN}{'─'*60}")
+    print(f"\n{M}{SB}ELIMINAR PRODUCTO")
+    print(f"{LINEA60}")
     
-    id_producto = obtener_entero(f"{Fore.GREEN}Ingrese el ID del producto a eliminar: {Fore.YELLOW}")
+    id_producto = obtener_entero(f"{G}Ingrese el ID del producto a eliminar: {Y}")
     if id_producto is None:
         return
     
     producto = gestor.buscar_producto_por_id(id_producto)
     if not producto:
-        print(f"{Fore.RED}El producto con ID {id_producto} no existe.")
+        print(f"{R}El producto con ID {id_producto} no existe.")
         return
     
-    print(f"\n{Fore.CYAN}Producto a eliminar:")
+    print(f"\n{C}Producto a eliminar:")
     mostrar_producto(producto)
     
-    confirmacion = input(f"\n{Fore.RED}¿Está seguro de eliminar este producto? (S/N): {Fore.YELLOW}")
+    confirmacion = input(f"\n{R}¿Está seguro de eliminar este producto? (S/N): {Y}")
     
     if confirmacion.upper() == "S":
         if gestor.eliminar_producto(id_producto):
-            print(f"{Fore.GREEN}{Style.BRIGHT}✓ Producto eliminado exitosamente.")
+            print(f"{G}{SB}✓ Producto eliminado exitosamente.")
         else:
-            print(f"{Fore.RED}{Style.BRIGHT}✗ Error al eliminar el producto.")
+            print(f"{R}{SB}✗ Error al eliminar el producto.")
     else:
-        print(f"{Fore.YELLOW}Operación cancelada.")
+        print(f"{Y}Operación cancelada.")
 
 
 def opcion_reporte_bajo_stock(gestor: GestorInventario) -> None:
     """Maneja la opción de generar reporte de bajo stock"""
-    print(f"\n{Fore.MAGENTA}{Style.BRIGHT}REPORTE DE BAJO STOCK")
-    print(f"{Fore.CYAN}{'─'*60}")
+    print(f"\n{M}{SB}REPORTE DE BAJO STOCK")
+    print(f"{LINEA60}")
     
-    limite = obtener_entero(f"{Fore.GREEN}Ingrese el límite de cantidad: {Fore.YELLOW}")
+    limite = obtener_entero(f"{G}Ingrese el límite de cantidad: {Y}")
     if limite is None:
         return
     
-    productos = gestor.reporte_bajo_stock(limite)
+    total = gestor.contar_bajo_stock(limite)
     
-    if not productos:
-        print(f"{Fore.YELLOW}No hay productos con cantidad igual o inferior a {limite}.")
+    if not total:
+        print(f"{Y}No hay productos con cantidad igual o inferior a {limite}.")
         return
     
-    print(f"\n{Fore.RED}{Style.BRIGHT}⚠ ALERTA: {len(productos)} producto(s) con bajo stock:")
-    for producto in productos:
-        mostrar_producto(producto)
+    print(f"\n{R}{SB}⚠ ALERTA: {total} producto(s) con bajo stock:")
+    mostrar_productos(gestor.reporte_bajo_stock(limite))
+
+
+# Función que atiende cada opción del menú principal
+ACCIONES_MENU = {
+    "1": opcion_registrar,
+    "2": opcion_visualizar,
+    "3": opcion_buscar,
+    "4": opcion_actualizar,
+    "5": opcion_eliminar,
+    "6": opcion_reporte_bajo_stock,
+}
 
 
 def main():
     """Función principal del programa"""
     # Inicializar el gestor de inventario
-    gestor = GestorInventario()
-    
-    print(f"{Fore.CYAN}{Style.BRIGHT}")
+    with GestorInventario() as gestor:
+        ejecutar_menu(gestor)
+
+
+def ejecutar_menu(gestor: GestorInventario) -> None:
+    """Muestra la bienvenida y ejecuta el bucle principal del menú"""
+    print(f"{C}{SB}")
     print("╔════════════════════════════════════════════════════════════╗")
     print("║     SISTEMA DE GESTIÓN DE INVENTARIO - Versión 1.0        ║")
     print("╚════════════════════════════════════════════════════════════╝")
@@ -529,29 +809,20 @@ def main():
     # Bucle principal del programa
     while True:
         mostrar_menu_principal()
-        opcion = input(f"{Fore.GREEN}Seleccione una opción: {Fore.YELLOW}")
-        
-        if opcion == "1":
-            opcion_registrar(gestor)
-        elif opcion == "2":
-            opcion_visualizar(gestor)
-        elif opcion == "3":
-            opcion_buscar(gestor)
-        elif opcion == "4":
-            opcion_actualizar(gestor)
-        elif opcion == "5":
-            opcion_eliminar(gestor)
-        elif opcion == "6":
-            opcion_reporte_bajo_stock(gestor)
+        opcion = input(f"{G}Seleccione una opción: {Y}")
+        
+        accion = ACCIONES_MENU.get(opcion)
+        if accion:
+            accion(gestor)
         elif opcion == "0":
-            print(f"\n{Fore.CYAN}{Style.BRIGHT}Gracias por usar el Sistema de Gestión de Inventario.")
+            print(f"\n{C}{SB}Gracias por usar el Sistema de Gestión de Inventario.")
             print("¡Hasta pronto!")
             break
         else:
-            print(f"{Fore.RED}Opción no válida. Por favor, intente nuevamente.")
+            print(f"{R}Opción no válida. Por favor, intente nuevamente.")
         
         # Pausa antes de mostrar el menú nuevamente
-        input(f"\n{Fore.CYAN}Presione Enter para continuar...")
+        input(f"\n{C}Presione Enter para continuar...")
 
 
 if __name__ == "__main__":